@@ -5,6 +5,9 @@ from six.moves import urllib
 
 import tensorflow as tf
 
+# Preprocessed datasets keyed by (absolute CACHE_DIR, url_base), shared by all read_data instances
+_dataset_cache = {}
+
 
 class read_data:
 
@@ -65,6 +68,24 @@ class read_data:
         return df_features, df_labels, county_name
 
     def create_dataset(self):
-        """Return the final dataframe with preprocessed data."""
-        radon_features, radon_labels, county_name = self.preprocess_radon_dataset(*self.download_radon_dataset())
+        """Return the preprocessed features, labels and county names as (memoized, read-only) float32 arrays."""
+        key = (os.path.abspath(self.CACHE_DIR), self.url_base)
+        if key not in _dataset_cache:
+            df_features, df_labels, county_name = self.preprocess_radon_dataset(*self.download_radon_dataset())
+            radon_features = np.ascontiguousarray(df_features.to_numpy(dtype=np.float32))
+            radon_labels = df_labels.to_numpy(dtype=np.float32)
+            radon_features.flags.writeable = False
+            radon_labels.flags.writeable = False
+            _dataset_cache[key] = radon_features, radon_labels, tuple(county_name)
+        radon_features, radon_labels, county_name = _dataset_cache[key]
         return radon_features, radon_labels, county_name
+
+    def split_dataset(self, frac=0.8, seed=42):
+        """Randomly split the dataset into float32 training and testing arrays."""
+        features, labels, _ = self.create_dataset()
+
+        rng = np.random.default_rng(seed)
+        rnd = rng.random(len(features), dtype=np.float32) < np.float32(frac)
+        train_x, train_y = features[rnd], labels[rnd]
+        test_x, test_y = features[~rnd], labels[~rnd]
+        return train_x, train_y, test_x, test_y
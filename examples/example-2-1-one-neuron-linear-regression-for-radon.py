@@ -11,10 +11,6 @@ import matplotlib.font_manager as fm
 import tensorflow as tf
 from tensorflow import keras
 from keras import layers
-# To install tensorflow_docs use:
-# pip install git+https://github.com/tensorflow/docs
-import tensorflow_docs as tfdocs
-import tensorflow_docs.modeling
 
 # Ignore warnings
 import warnings
@@ -49,62 +45,50 @@ print('Number of counties included in the dataset: ', num_counties)
 # Number of counties included in the dataset:  85
 print('Number of total samples: ', num_observations)
 # Number of total samples:  919
-print(radon_features.head())
-#    floor  county  log_uranium_ppm  pcterr
-# 0      1       0         0.502054     9.7
-# 1      0       0         0.502054    14.5
-# 2      0       0         0.502054     9.6
-# 3      0       0         0.502054    24.3
-# 4      0       1         0.428565    13.8
-print(radon_features)
-# 0        1       0         0.502054     9.7
-# 1        0       0         0.502054    14.5
-# 2        0       0         0.502054     9.6
-# 3        0       0         0.502054    24.3
-# 4        0       1         0.428565    13.8
-# ..     ...     ...              ...     ...
-# 922      0      83         0.913909     4.5
-# 923      0      83         0.913909     8.3
-# 924      0      83         0.913909     5.2
-# 925      0      84         1.426590     9.6
-# 926      0      84         1.426590     8.0
-#
-# [919 rows x 4 columns]
-print(radon_labels)
-# 0      2.2
-# 1      2.2
-# 2      2.9
-# 3      1.0
-# 4      3.1
-#       ...
-# 922    6.4
-# 923    4.5
-# 924    5.0
-# 925    3.7
-# 926    2.9
-# Name: radon, Length: 919, dtype: float64
-
-np.random.seed(42)
-rnd = np.random.rand(len(radon_features)) < 0.8
-train_x = radon_features[rnd]  # training dataset (features, i.e. inputs)
-train_y = radon_labels[rnd]  # training dataset (labels, i.e. outputs)
-test_x = radon_features[~rnd]  # testing dataset (features, i.e inputs)
-test_y = radon_labels[~rnd]  # testing dataset (labels, i.e. outputs)
+# radon_features: float32 array with the columns floor, county, log_uranium_ppm, pcterr
+print(radon_features.shape)
+# (919, 4)
+print(radon_features[:5])
+# [[ 1.        0.        0.502054  9.7     ]
+#  [ 0.        0.        0.502054 14.5     ]
+#  [ 0.        0.        0.502054  9.6     ]
+#  [ 0.        0.        0.502054 24.3     ]
+#  [ 0.        1.        0.428565 13.8     ]]
+print(radon_labels.shape)
+# (919,)
+print(radon_labels[:5])
+# [2.2 2.2 2.9 1.  3.1]
+
+# train_x, test_x: training and testing datasets (features, i.e. inputs)
+# train_y, test_y: training and testing datasets (labels, i.e. outputs)
+# All of them are float32 NumPy arrays, so Keras does not have to cast them on every batch
+train_x, train_y, test_x, test_y = rd.split_dataset(frac=0.8, seed=42)
 print('The training dataset dimensions are: ', train_x.shape)
-# The training dataset dimensions are:  (733, 4)
+# The training dataset dimensions are:  (734, 4)
 print('The testing dataset dimensions are: ', test_x.shape)
-# The testing dataset dimensions are:  (186, 4)
+# The testing dataset dimensions are:  (185, 4)
 
 
 def build_model():
     _model = keras.Sequential([
-        layers.Dense(1, input_shape=[len(train_x.columns)])
+        layers.Dense(1, input_shape=[train_x.shape[1]],
+                     # seeded, so that the recorded outputs below are reproducible
+                     kernel_initializer=keras.initializers.GlorotUniform(seed=42))
     ])
-    optimizer = tf.keras.optimizers.RMSprop(learning_rate=0.001)
+    # The features are not normalized, so the problem is badly conditioned and plain
+    # SGD needs a small learning rate; momentum makes up for it, and with full-batch
+    # steps it converges in far fewer epochs than RMSprop(learning_rate=0.001).
+    # Mind the margin: the largest curvature of the full-batch MSE is about 5000 on
+    # this split, so with momentum 0.95 SGD diverges above a learning rate of about
+    # 2 * (1 + 0.95) / 5000 = 0.00078. Re-check this limit before changing the data,
+    # the split or the learning rate.
+    optimizer = tf.keras.optimizers.SGD(learning_rate=0.0005, momentum=0.95)
     _model.compile(
         loss='mse',
         optimizer=optimizer,
-        metrics=['mse']
+        metrics=['mse'],
+        # fuse the forward/backward/optimizer step into one XLA kernel
+        jit_compile=True
     )
     return _model
 
@@ -126,46 +110,61 @@ model.summary()
 #  5 parameters to be trained—the weights associated
 #  with the 4 features, plus the bias
 
-EPOCHS = 1000
+# fit() is given the NumPy arrays directly: Keras feeds array and tensor inputs
+# alike through a host-side tf.data pipeline, so uploading them to the device
+# beforehand would not keep them resident there
+EPOCHS = 400
 history = model.fit(
     train_x, train_y,
     epochs=EPOCHS,
-    verbose=0,
-    callbacks=[tfdocs.modeling.EpochDots()]
+    batch_size=len(train_x),
+    verbose=0
 )
 
 hist = pd.DataFrame(history.history)
 hist['epoch'] = history.epoch
 print(hist.tail())
+# Output of one CPU run; the last digits may differ between runs because of
+# floating-point round-off
+#           loss        mse  epoch
+# 395  15.380397  15.380397    395
+# 396  15.380152  15.380152    396
+# 397  15.379914  15.379914    397
+# 398  15.379675  15.379675    398
+# 399  15.379438  15.379438    399
 
 f = set_style().set_general_style_parameters()
+# parse the font file once and reuse it for all labels
+font_props = fm.FontProperties(fname=f)
 fig = plt.figure()
 ax = fig.add_subplot(111)
 plt.plot(hist['epoch'], hist['mse'], color='blue')
-plt.ylabel('Cost Function (MSE)', fontproperties=fm.FontProperties(fname=f))
-plt.xlabel('Number of Iterations', fontproperties=fm.FontProperties(fname=f))
+plt.ylabel('Cost Function (MSE)', fontproperties=font_props)
+plt.xlabel('Number of Iterations', fontproperties=font_props)
 plt.ylim(0, 50)
-plt.xlim(0, 1000)
+plt.xlim(0, EPOCHS)
 plt.axis(True)
 plt.show()
 
 weights = model.get_weights() # return a numpy list of weights
 print(weights)
-# [array([[-6.5743500e-01],
-#        [ 1.4790290e-03],
-#        [ 2.7411327e+00],
-#        [-2.0764650e-01]], dtype=float32), array([4.3961654], dtype=float32)]
-
-# Predict radon activities with the built linear regression model
-test_predictions = model.predict(test_x).flatten()
+# [array([[-4.2962256e-01],
+#        [ 1.3617089e-03],
+#        [ 3.6642895e+00],
+#        [-1.9483401e-01]], dtype=float32), array([3.3675196], dtype=float32)]
+
+# Predict radon activities with the built linear regression model.
+# The test set is small, so call the model directly rather than through
+# model.predict, which sets up a tf.data pipeline and callbacks.
+test_predictions = model(tf.constant(test_x, dtype=tf.float32), training=False).numpy().flatten()
 # Predictions vs. True Values PLOT
 fig = plt.figure()
 ax = fig.add_subplot(111)
 plt.scatter(test_y, test_predictions, marker='o', c='blue')
 plt.plot([-5, 20], [-5, 20], color='black', ls='--')
-plt.ylabel('Predictions [activity]', fontproperties=fm.FontProperties(fname=f))
-plt.xlabel('True Values [activity]', fontproperties=fm.FontProperties(fname=f))
-plt.title('Linear Regression with One Neuron', fontproperties=fm.FontProperties(fname=f))
+plt.ylabel('Predictions [activity]', fontproperties=font_props)
+plt.xlabel('True Values [activity]', fontproperties=font_props)
+plt.title('Linear Regression with One Neuron', fontproperties=font_props)
 plt.ylim(-5, 20)
 plt.xlim(-5, 20)
 plt.axis(True)